@@ -1,6 +1,5 @@
 """Pytest configuration file for the Waldiez Jupyter extension."""
 
-import json
 import os
 from collections.abc import Generator
 from pathlib import Path
@@ -10,11 +9,19 @@ import pytest
 from filelock import FileLock
 from jupyter_server import DEFAULT_STATIC_FILES_PATH
 
+from waldiez_jupyter.handlers.extra_static_files import (
+    ensure_extra_static_files,
+)
+
 os.environ["JUPYTER_PLATFORM_DIRS"] = "1"
 os.environ["JUPYTER_IS_TESTING"] = "1"
 
 pytest_plugins = ("pytest_jupyter.jupyter_server",)
 
+_DATA_DIR = Path(__file__).parent / "waldiez_jupyter" / "tests" / "data"
+_STATIC_PATH = Path(DEFAULT_STATIC_FILES_PATH)
+_MONACO_FILE = _STATIC_PATH / "monaco_latest_version"
+
 # pylint: disable=unused-argument,redefined-outer-name
 # pyright: reportUnusedParameter=false
 
@@ -36,47 +43,59 @@ def jp_server_config(jp_server_config: dict[str, Any]) -> dict[str, Any]:
     return {"ServerApp": {"jpserver_extensions": {"waldiez_jupyter": True}}}
 
 
-def _load_worker_list(fn: Path) -> list[str]:
-    """Read the worker id list from a file."""
-    return json.loads(fn.read_text())["workers"]
-
-
-def _write_worker_list(fn: Path, workers: list[str]) -> None:
-    """Write the worker id list to a file."""
-    fn.write_text(json.dumps({"workers": workers}))
-
-
 def _remove_monaco_latest_version() -> None:
     """Remove the monaco latest version file."""
     # remove STATIC_FILES_PATH/monaco_latest_version if it exists
     # to force/check for a new download
-    static_path = Path(DEFAULT_STATIC_FILES_PATH)
-    monaco_latest_version = static_path / "monaco_latest_version"
-    if monaco_latest_version.exists():
-        monaco_latest_version.unlink(missing_ok=True)
+    _MONACO_FILE.unlink(missing_ok=True)
+
 
+def _should_remove_monaco_latest_version(config: pytest.Config) -> bool:
+    """Check if we should force a new monaco check/download."""
+    # keep the existing files when re-running failures (--lf / --ff)
+    # or if explicitly requested (e.g. in CI jobs with a cached copy)
+    if os.environ.get("WALDIEZ_KEEP_MONACO"):
+        return False
+    return not (
+        config.getoption("lf", False) or config.getoption("failedfirst", False)
+    )
 
-def _before(worker_id: str) -> None:
-    """Run before all tests."""
+
+def _prepare_static_files(config: pytest.Config) -> None:
+    """Prepare the (shared) static files for the servers of the tests."""
+    if _should_remove_monaco_latest_version(config):
+        _remove_monaco_latest_version()
+    # before any server starts: each server's setup_handlers then finds
+    # the monaco files in place, instead of downloading them concurrently
+    # (the static path is shared by all the workers)
+    ensure_extra_static_files(_STATIC_PATH)
+
+
+def _before(
+    worker_id: str,
+    tmp_path_factory: pytest.TempPathFactory,
+    config: pytest.Config,
+) -> None:
+    """Run before all tests (once, even with multiple workers)."""
     if worker_id == "master":
         # not executing with multiple workers
-        _remove_monaco_latest_version()
+        _prepare_static_files(config)
         return
     # credits:
-    # https://github.com/pytest-dev/pytest-xdist/issues/783#issuecomment-1793593178
-    lock_file = Path(DEFAULT_STATIC_FILES_PATH) / "workers.json.lock"
-    worker_list_file = Path(DEFAULT_STATIC_FILES_PATH) / "workers.json"
-    with FileLock(str(lock_file)):
-        is_first_worker = not worker_list_file.is_file()
-        if worker_list_file.is_file():
-            workers = _load_worker_list(worker_list_file)
-        else:
-            workers = []
-            is_first_worker = True
-        workers.append(worker_id)
-        _write_worker_list(worker_list_file, workers)
-        if is_first_worker:
-            _remove_monaco_latest_version()
+    # https://pytest-xdist.readthedocs.io/en/stable/how-to.html
+    # (making session-scoped fixtures execute only once)
+    # all the workers share the parent of their base temp dir,
+    # the first one to get the lock does the work and leaves a sentinel,
+    # the others wait (for the lock) until it is done.
+    root = tmp_path_factory.getbasetemp().parent
+    sentinel = root / "monaco.done"
+    if os.path.exists(sentinel):
+        return
+    with FileLock(str(root / "monaco.lock")):
+        if os.path.exists(sentinel):
+            return
+        _prepare_static_files(config)
+        sentinel.touch()
 
 
 def _after() -> None:
@@ -86,13 +105,15 @@ def _after() -> None:
 # pylint: disable=unused-argument
 @pytest.fixture(scope="session", autouse=True)
 def before_and_after_tests(
-    request: Any, tmp_path_factory: pytest.TempPathFactory, worker_id: str
+    request: pytest.FixtureRequest,
+    tmp_path_factory: pytest.TempPathFactory,
+    worker_id: str,
 ) -> Generator[None, None, None]:
     """Fixture to run before and after all tests.
 
     Parameters
     ----------
-    request : Any
+    request : pytest.FixtureRequest
         The request object.
     tmp_path_factory : pytest.TempPathFactory
         The temporary path factory.
@@ -104,7 +125,7 @@ def before_and_after_tests(
     Generator[None, None, None]
         The generator to run the tests.
     """
-    _before(worker_id)
+    _before(worker_id, tmp_path_factory, request.config)
     try:
         yield
     finally:
@@ -120,5 +141,134 @@ def data_dir() -> Path:
     Path
         The tests data directory.
     """
-    here = Path(__file__).parent
-    return here / "waldiez_jupyter" / "tests" / "data"
+    return _DATA_DIR
+
+
+@pytest.fixture(scope="session")
+def waldiez_flow_bytes() -> bytes:
+    """Return the content of the test flow (read once per session).
+
+    Returns
+    -------
+    bytes
+        The content of data/flow.waldiez.
+    """
+    return (_DATA_DIR / "flow.waldiez").read_bytes()
+
+
+@pytest.fixture(scope="session")
+def dummy_txt_bytes() -> bytes:
+    """Return the content of the dummy text file (read once per session).
+
+    Returns
+    -------
+    bytes
+        The content of data/dummy.txt.
+    """
+    return (_DATA_DIR / "dummy.txt").read_bytes()
+
+
+@pytest.fixture(scope="session")
+def blank_png_bytes() -> bytes:
+    """Return the content of the blank image (read once per session).
+
+    Returns
+    -------
+    bytes
+        The content of data/blank.png.
+    """
+    return (_DATA_DIR / "blank.png").read_bytes()
+
+
+@pytest.fixture
+def waldiez_in_root(
+    jp_root_dir: Path,
+    waldiez_flow_bytes: bytes,
+) -> Generator[Path, None, None]:
+    """Write the test flow in the server's root directory.
+
+    Parameters
+    ----------
+    jp_root_dir : Path
+        The Jupyter server root directory.
+    waldiez_flow_bytes : bytes
+        The content of the test flow.
+
+    Yields
+    ------
+    Path
+        The path of the flow in the root directory.
+    """
+    waldiez_path = jp_root_dir / "flow.waldiez"
+    waldiez_path.write_bytes(waldiez_flow_bytes)
+    yield waldiez_path
+    waldiez_path.unlink(missing_ok=True)
+
+
+@pytest.fixture
+def export_artifacts() -> Generator[None, None, None]:
+    """Remove the files an export test might leave in the data directory.
+
+    Yields
+    ------
+    Generator[None, None, None]
+        The generator to run the test.
+    """
+    yield
+    for artifact in (
+        _DATA_DIR / "flow.py",
+        _DATA_DIR / "flow.ipynb",
+        _DATA_DIR / "waldiez_flow_api_keys.py",
+        _DATA_DIR / "test_flow_api_keys.py",
+        _DATA_DIR / "waldiez_api_keys.py",
+    ):
+        artifact.unlink(missing_ok=True)
+
+
+@pytest.fixture(scope="session")
+def expected_exports(
+    tmp_path_factory: pytest.TempPathFactory,
+    waldiez_flow_bytes: bytes,
+) -> dict[str, bytes]:
+    """Export the test flow directly, not through the server (once).
+
+    Parameters
+    ----------
+    tmp_path_factory : pytest.TempPathFactory
+        The temporary path factory.
+    waldiez_flow_bytes : bytes
+        The content of the test flow.
+
+    Returns
+    -------
+    dict[str, bytes]
+        The expected content of the exported file, per extension.
+    """
+    # pylint: disable=import-outside-toplevel
+    from waldiez import WaldiezExporter
+
+    tmp_dir = tmp_path_factory.mktemp("expected")
+    waldiez_path = tmp_dir / "flow.waldiez"
+    waldiez_path.write_bytes(waldiez_flow_bytes)
+    exports: dict[str, bytes] = {}
+    for extension in ("py", "ipynb"):
+        exported = waldiez_path.with_suffix(f".{extension}")
+        WaldiezExporter.load(waldiez_path).export(exported, force=True)
+        exports[extension] = exported.read_bytes()
+    return exports
+
+
+@pytest.fixture(scope="session")
+def expected_export_responses() -> dict[str, dict[str, list[str]]]:
+    """Build the expected responses of exporting the test flow (once).
+
+    Returns
+    -------
+    dict[str, dict[str, list[str]]]
+        The expected (parsed) response, per extension.
+    """
+    waldiez_path = (_DATA_DIR / "flow.waldiez").relative_to(Path.cwd())
+    return {
+        extension: {"files": [str(waldiez_path.with_suffix(f".{extension}"))]}
+        for extension in ("py", "ipynb")
+    }
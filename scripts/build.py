@@ -14,29 +14,22 @@ ROOT_DIR = Path(__file__).parent.parent
 
 def install_dependencies() -> None:
     """Install the dependencies for building the package."""
+    pip_install = [
+        sys.executable,
+        "-m",
+        "pip",
+        "install",
+        "--no-input",
+        "--disable-pip-version-check",
+    ]
     subprocess.run(  # nosemgrep # nosec
-        [
-            sys.executable,
-            "-m",
-            "pip",
-            "install",
-            "--upgrade",
-            "pip",
-            "build",
-            "twine",
-        ],
+        [*pip_install, "--upgrade", "pip", "build", "twine"],
         check=True,
         cwd=ROOT_DIR,
     )
+    # no --upgrade here: unpinned requirements are only installed if missing
     subprocess.run(  # nosemgrep # nosec
-        [
-            sys.executable,
-            "-m",
-            "pip",
-            "install",
-            "-r",
-            os.path.join("requirements", "all.txt"),
-        ],
+        [*pip_install, "-r", os.path.join("requirements", "all.txt")],
         check=True,
         cwd=ROOT_DIR,
     )
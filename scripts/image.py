@@ -178,7 +178,6 @@ def run_command(command: list[str], dry_run: bool = False) -> None:
         subprocess.run(
             command,
             check=True,
-            env=os.environ,
             cwd=_ROOT_DIR,
             stdout=sys.stdout,
             stderr=subprocess.STDOUT,
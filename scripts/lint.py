@@ -43,7 +43,9 @@ def prefer_uv() -> bool:
 
 def ensure_venv() -> None:
     """Ensure the virtual environment executable exists."""
-    if os.path.exists(ROOT_DIR / ".venv") or in_hatch_environment():
+    # pyvenv.cfg marks an actual venv, not just an existing folder
+    pyvenv_cfg = ROOT_DIR / ".venv" / "pyvenv.cfg"
+    if pyvenv_cfg.is_file() or in_hatch_environment():
         return
     if prefer_uv():
         print("Creating virtual environment with uv...")
@@ -77,8 +79,7 @@ def get_executable() -> str:
         return sys.executable
     if in_hatch_environment():
         return sys.executable
-    if not os.path.exists(ROOT_DIR / ".venv"):
-        ensure_venv()
+    ensure_venv()
     if sys.platform != "win32":
         if os.path.exists(ROOT_DIR / ".venv" / "bin" / "python"):
             return str(ROOT_DIR / ".venv" / "bin" / "python")
@@ -3,7 +3,6 @@
 
 """Merge lcov files from multiple directories."""
 
-import os
 import shutil
 import subprocess  # nosemgrep # nosec
 import sys
@@ -29,7 +28,6 @@ def run_command(args: list[str]) -> None:
         stdout=sys.stdout,
         stderr=subprocess.STDOUT,
         check=True,
-        env=os.environ,
     )
 
 
@@ -6,14 +6,16 @@
 if both, we subprocess two calls
 """
 
-import multiprocessing
+import csv
 import os
 import shutil
+import signal
 import subprocess
 import sys
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
+os.environ["PYTHONUNBUFFERED"] = "1"
 
 VENV_DIR = ROOT_DIR / ".venv"
 EXE_ = ".exe" if sys.platform == "win32" else ""
@@ -26,31 +28,25 @@ JUPYTER_COMMAND = str(BIN_DIR / f"jupyter{EXE_}")
 PYTHON_COMMAND = str(BIN_DIR / f"python{EXE_}")
 
 
-def _do_start_jupyter() -> None:
-    os.environ["PYTHONUNBUFFERED"] = "1"
-    cmd = [JUPYTER_COMMAND, "lab", "-y", "--no-browser", "--autoreload"]
-    if (ROOT_DIR / "examples").exists():
-        cmd += ["--notebook-dir", "examples"]
-    subprocess.run(  # nosemgrep  # nosec
-        cmd,
-        cwd=ROOT_DIR,
-        check=True,
-        env=os.environ,
-    )
-
-
 def _start_jupyter() -> None:
     """Start the Jupyter server."""
     pid_path = ROOT_DIR / "jupyter.pid"
     if pid_path.exists():
         print("Jupyter server already running?, or stale pid file")
         return
-    multiprocessing.set_start_method("spawn")
-    p = multiprocessing.Process(target=_do_start_jupyter, daemon=True)
-    p.start()
-    pid = p.pid
-    with open(ROOT_DIR / "jupyter.pid", "w", encoding="utf-8") as f:
-        f.write(str(pid))
+    cmd = [JUPYTER_COMMAND, "lab", "-y", "--no-browser", "--autoreload"]
+    if (ROOT_DIR / "examples").exists():
+        cmd += ["--notebook-dir", "examples"]
+    # pylint: disable=consider-using-with
+    p = subprocess.Popen(  # nosemgrep  # nosec
+        cmd,
+        cwd=ROOT_DIR,
+    )
+    # write and rename: a partial/corrupt pid file is never visible
+    tmp_pid_path = pid_path.with_suffix(".pid.tmp")
+    with open(tmp_pid_path, "w", encoding="utf-8") as f:
+        f.write(str(p.pid))
+    os.replace(tmp_pid_path, pid_path)
 
 
 def _start_yarn() -> None:
@@ -86,29 +82,62 @@ def _stop_using_pid() -> None:
         pid_path.unlink()
 
 
-# pylint: disable=broad-exception-caught
-# noinspection PyBroadException
 def _stop_using_tasklist() -> None:
     """Stop the Jupyter server using tasklist."""
-    cmd = 'tasklist /fi "imagename eq jupyter-lab.exe" /fo csv /nh'  # noqa
-    # noinspection SubprocessShellMode
+    # no shell, one process: tasklist itself does the filtering
     result = subprocess.run(  # nosemgrep  # nosec
-        cmd,
-        shell=True,
-        check=True,
+        [
+            "tasklist",
+            "/fi",
+            "imagename eq jupyter-lab.exe",
+            "/fo",
+            "csv",
+            "/nh",
+        ],
+        check=False,
         stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
     )
-    if not result.stdout:
-        return
-    try:
-        pid = int(result.stdout.decode().split(",")[1].strip('"'))
-    except BaseException:
-        return
-    try:
-        os.kill(pid, 15)
-    except BaseException:
-        pass
+    # rows: "jupyter-lab.exe","1234","Console","1","12,345 K"
+    # or a single "INFO: No tasks are running..." line
+    for row in csv.reader(result.stdout.decode(errors="replace").splitlines()):
+        if len(row) < 2 or not row[1].isdigit():
+            continue
+        try:
+            os.kill(int(row[1]), signal.SIGTERM)
+        except OSError:
+            pass
+
+
+def _find_pids(keywords: tuple[str, ...]) -> list[int]:
+    """Find the pids of the processes whose command contains a keyword."""
+    pids: list[int] = []
+    # match on bytes: a command line is not necessarily valid utf-8
+    byte_keywords = tuple(kwd.encode() for kwd in keywords)
+    proc_dir = Path("/proc")
+    if proc_dir.is_dir():
+        for entry in proc_dir.iterdir():
+            if not entry.name.isdigit():
+                continue
+            try:
+                cmdline = (entry / "cmdline").read_bytes()
+            except OSError:
+                continue
+            if any(kwd in cmdline for kwd in byte_keywords):
+                pids.append(int(entry.name))
+        return pids
+    # no procfs (e.g. macOS): a single ps call, no shell pipeline
+    result = subprocess.run(  # nosemgrep  # nosec
+        ["ps", "-A", "-o", "pid=,command="],
+        check=False,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    for line in result.stdout.splitlines():
+        pid_str, _, command = line.strip().partition(b" ")
+        if pid_str.isdigit() and any(kwd in command for kwd in byte_keywords):
+            pids.append(int(pid_str))
+    return pids
 
 
 def _stop() -> None:
@@ -118,15 +147,14 @@ def _stop() -> None:
     if sys.platform == "win32":
         _stop_using_tasklist()
         return
-    for kwd in ("ipykernel_launcher", "jupyter-lab"):
-        # pylint: disable=line-too-long
-        cmd = f"ps aux | grep -v grep | grep {kwd} | awk '{{print $2}}' | xargs kill -9 > /dev/null 2>&1 || true"  # noqa E501
-        # noinspection SubprocessShellMode
-        subprocess.run(
-            cmd,
-            shell=True,
-            check=True,
-        )  # nosemgrep  # nosec
+    own_pid = os.getpid()
+    for pid in _find_pids(("ipykernel_launcher", "jupyter-lab")):
+        if pid == own_pid:
+            continue
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
 
 
 def main() -> None:
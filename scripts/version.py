@@ -8,10 +8,16 @@
 
 import argparse
 import json
+import re
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).parent.parent
 PACKAGE_JSON_PATH = ROOT_DIR / "package.json"
+# the first "version" key in package.json is the top-level one
+_PACKAGE_VERSION_RE = re.compile(r'("version"\s*:\s*)"([^"]*)"')
+_WALDIEZ_DEPENDENCY_RE = re.compile(
+    r'^(\s*)"waldiez[<>=][^"]*"(,?)[ \t]*$', re.MULTILINE
+)
 
 if not PACKAGE_JSON_PATH.exists():
     raise FileNotFoundError("The package.json file was not found")
@@ -26,6 +32,11 @@ def get_version() -> str:
         The current version in the format x.y.z
     """
     with open(PACKAGE_JSON_PATH, "r", encoding="utf-8") as file:
+        # "version" is near the top, no need to parse the whole file
+        match = _PACKAGE_VERSION_RE.search(file.read(4096))
+        if match:
+            return match.group(2)
+        file.seek(0)
         data = json.load(file)
     return data["version"]
 
@@ -42,9 +53,7 @@ def set_version(version_string: str) -> None:
     ------
     ValueError
         If the version string is not in the format x.y.z
-        If the version string was not found in the _version.py file
-    FileNotFoundError
-        If the _version.py file was not found
+        If the version string was not found in the package.json file
     """
     try:
         major_str, minor_str, patch_str = version_string.split(".")
@@ -54,11 +63,15 @@ def set_version(version_string: str) -> None:
             "The version string must be in the format x.y.z"
         ) from error
     new_version = f"{major}.{minor}.{patch}"
-    with open(PACKAGE_JSON_PATH, "r", encoding="utf-8") as file:
-        data = json.load(file)
-    data["version"] = new_version
+    # patch only the version value, keep the rest of the file as is
+    content = PACKAGE_JSON_PATH.read_text(encoding="utf-8")
+    new_content, count = _PACKAGE_VERSION_RE.subn(
+        rf'\g<1>"{new_version}"', content, count=1
+    )
+    if not count:
+        raise ValueError("The version was not found in package.json")
     with open(PACKAGE_JSON_PATH, "w", encoding="utf-8", newline="\n") as file:
-        json.dump(data, file, indent=4)
+        file.write(new_content)
 
 
 def update_waldiez_dependency(version_string: str) -> None:
@@ -86,22 +99,17 @@ def update_waldiez_dependency(version_string: str) -> None:
     if not pyproject_toml_path.exists():
         raise FileNotFoundError("The pyproject.toml file was not found")
 
-    with open(pyproject_toml_path, "r", encoding="utf-8") as file:
-        lines = file.readlines()
-
-    found_dep = False
-    for i, line in enumerate(lines):
-        if "waldiez>" in line or "waldiez=" in line or "waldiez<" in line:
-            lines[i] = f'    "waldiez=={version_string}",' + "\n"
-            found_dep = True
-            break
-    if not found_dep:
+    content = pyproject_toml_path.read_text(encoding="utf-8")
+    new_content, count = _WALDIEZ_DEPENDENCY_RE.subn(
+        rf'\g<1>"waldiez=={version_string}"\g<2>', content, count=1
+    )
+    if not count:
         raise RuntimeError(
             "The waldiez package was not found in the pyproject.toml file"
         )
 
     with open(pyproject_toml_path, "w", encoding="utf-8", newline="\n") as file:
-        file.writelines(lines)
+        file.write(new_content)
 
 
 def main() -> None:
@@ -8,7 +8,11 @@
 
 """Jupyter server extension for Waldiez."""
 
-from jupyter_server.serverapp import ServerApp
+import warnings
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from jupyter_server.serverapp import ServerApp
 
 try:
     from ._version import __version__  # noqa
@@ -17,13 +21,19 @@ except ImportError:  # pragma: no cover
     # in editable mode with pip. It is highly recommended to install
     # the package from a stable release or in editable mode:
     # https://pip.pypa.io/en/stable/topics/local-project-installs/#editable-installs
-    import warnings
-
-    warnings.warn("Importing 'waldiez_jupyter' outside a proper installation.")
-    __version__ = "dev"
 
-
-from .handlers import setup_handlers
+    def __getattr__(name: str) -> str:
+        # only warn (once) if/when the version is actually requested
+        if name != "__version__":
+            raise AttributeError(
+                f"module {__name__!r} has no attribute {name!r}"
+            )
+        warnings.warn(
+            "Importing 'waldiez_jupyter' outside a proper installation.",
+            stacklevel=2,
+        )
+        globals()["__version__"] = "dev"
+        return "dev"
 
 
 def _jupyter_labextension_paths() -> list[dict[str, str]]:
@@ -34,7 +44,7 @@ def _jupyter_server_extension_points() -> list[dict[str, str]]:
     return [{"module": "waldiez_jupyter"}]
 
 
-def _load_jupyter_server_extension(server_app: ServerApp) -> None:
+def _load_jupyter_server_extension(server_app: "ServerApp") -> None:
     """Register the API handler to receive HTTP requests from the frontend.
 
     Parameters
@@ -42,6 +52,10 @@ def _load_jupyter_server_extension(server_app: ServerApp) -> None:
     server_app: ServerApp
         JupyterLab application instance
     """
+    # deferred: extension discovery only needs the *_paths/_points above
+    # pylint: disable=import-outside-toplevel
+    from .handlers import setup_handlers
+
     setup_handlers(server_app.web_app)
     name = "@waldiez/jupyter"
     server_app.log.info(f"Registered {name} server extension")
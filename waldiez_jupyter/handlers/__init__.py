@@ -5,6 +5,7 @@
 """Extension handlers for the Jupyter Server."""
 
 import os
+from functools import cache
 
 from jupyter_server.serverapp import ServerWebApplication
 from jupyter_server.utils import url_path_join
@@ -16,6 +17,33 @@ from .files_handler import FilesHandler
 from .interrupt_handler import InterruptHandler
 from .upload_handler import UploadHandler
 
+# static paths already checked (by this process) for the monaco files
+_ENSURED_STATIC_PATHS: set[str] = set()
+
+
+@cache
+def _url_patterns(base_url: str) -> tuple[str, str, str, str, str, str]:
+    """Get the url patterns of the extension handlers.
+
+    Parameters
+    ----------
+    base_url : str
+        The server's base url.
+
+    Returns
+    -------
+    tuple[str, str, str, str, str, str]
+        The files, upload, gather, checkpoints, min-maps and vs patterns.
+    """
+    return (
+        url_path_join(base_url, "waldiez", "files"),
+        url_path_join(base_url, "waldiez", "upload"),
+        url_path_join(base_url, "waldiez", "gather"),
+        url_path_join(base_url, "waldiez", "checkpoints"),
+        rf"{url_path_join(base_url, 'min-maps')}/(.*)",
+        rf"{url_path_join(base_url, 'vs')}/(.*)",
+    )
+
 
 def setup_handlers(web_app: ServerWebApplication) -> None:
     """Add the extension handlers to the Jupyter server web application.
@@ -31,15 +59,19 @@ def setup_handlers(web_app: ServerWebApplication) -> None:
         static_path = static_path_or_paths[-1]
     else:
         static_path = static_path_or_paths
-    ensure_extra_static_files(static_path)
+    if str(static_path) not in _ENSURED_STATIC_PATHS:
+        ensure_extra_static_files(static_path)
+        _ENSURED_STATIC_PATHS.add(str(static_path))
     base_url = web_app.settings["base_url"]
-    files_pattern = url_path_join(base_url, "waldiez", "files")
-    upload_pattern = url_path_join(base_url, "waldiez", "upload")
-    gather_pattern = url_path_join(base_url, "waldiez", "gather")
-    checkpoints_pattern = url_path_join(base_url, "waldiez", "checkpoints")
-    min_maps_pattern = url_path_join(base_url, "min-maps")
+    (
+        files_pattern,
+        upload_pattern,
+        gather_pattern,
+        checkpoints_pattern,
+        min_maps_pattern,
+        vs_pattern,
+    ) = _url_patterns(base_url)
     min_maps_path = os.path.join(static_path, "min-maps")
-    vs_pattern = url_path_join(base_url, "vs")
     vs_path = os.path.join(static_path, "vs")
     web_app.add_handlers(
         host_pattern,
@@ -49,12 +81,12 @@ def setup_handlers(web_app: ServerWebApplication) -> None:
             (gather_pattern, InterruptHandler),
             (upload_pattern, UploadHandler),
             (
-                rf"{min_maps_pattern}/(.*)",
+                min_maps_pattern,
                 web.StaticFileHandler,
                 {"path": min_maps_path},
             ),
             (
-                rf"{vs_pattern}/(.*)",
+                vs_pattern,
                 web.StaticFileHandler,
                 {"path": vs_path},
             ),
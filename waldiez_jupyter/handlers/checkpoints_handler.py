@@ -4,18 +4,20 @@
 
 import json
 from collections.abc import Awaitable
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from jupyter_server.base.handlers import APIHandler
 from tornado import httputil
 from tornado.web import Application, HTTPError, authenticated
-from waldiez.storage import StorageManager
+
+if TYPE_CHECKING:
+    from waldiez.storage import StorageManager
 
 
 class CheckpointsHandler(APIHandler):
     """Checkpoints handler to handle workflow checkpoints."""
 
-    _manager: StorageManager
+    _manager: "StorageManager"
     _manager_initiated: bool = False
 
     def __init__(
@@ -30,6 +32,10 @@ class CheckpointsHandler(APIHandler):
             **kwargs,
         )
         if not self._manager_initiated:
+            # deferred: importing waldiez is slow, only pay for it when needed
+            # pylint: disable=import-outside-toplevel
+            from waldiez.storage import StorageManager
+
             self._manager_initiated = True
             self._manager = StorageManager()
 
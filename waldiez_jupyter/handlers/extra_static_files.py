@@ -19,20 +19,55 @@ import tarfile
 import tempfile
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 import urllib3
-from packaging import version
+
+if TYPE_CHECKING:
+    from _typeshed import WriteableBuffer
 
 REGISTRY_BASE_URL = "https://registry.npmjs.org"
 PACKAGE_NAME = "monaco-editor"
 DETAILS_JSON = "monaco_details.json"
+NPM_ABBREVIATED_METADATA = "application/vnd.npm.install-v1+json"
 PINNED_VERSION: str | None = "0.55.1"
+CHUNK_SIZE = 64 * 1024
+# the only tarball entries we keep (vs/ and min-maps/)
+_KEEP_MEMBERS = ("package/min/vs/", "package/min-maps/")
+# tarfile.extractall's filter parameter was added in:
+# 3.10.12, 3.11.4 and 3.12
+_HAS_FILTER_PARAMETER = sys.version_info >= (3, 11, 4) or (
+    (3, 10, 12) <= sys.version_info < (3, 11)
+)
 
 LOG = logging.getLogger(__name__)
+_HTTP: urllib3.PoolManager | None = None
 
 # pylint: disable=broad-except
 
 
+def _get_http() -> urllib3.PoolManager:
+    """Get the (shared) pool manager for the registry requests.
+
+    The metadata and the tarball requests can reuse the
+    same (keep-alive) connection this way.
+
+    Returns
+    -------
+    urllib3.PoolManager
+        The pool manager.
+    """
+    global _HTTP  # pylint: disable=global-statement
+    if _HTTP is None:
+        _HTTP = urllib3.PoolManager(
+            num_pools=2,
+            maxsize=4,
+            headers={"User-Agent": "waldiez-jupyter"},
+            retries=urllib3.Retry(total=3, backoff_factor=0.3),
+        )
+    return _HTTP
+
+
 def ensure_extra_static_files(static_root_path: str | Path) -> None:
     """Ensure extra static files are present.
 
@@ -49,15 +84,21 @@ def ensure_extra_static_files(static_root_path: str | Path) -> None:
     if not isinstance(static_root_path, Path):
         static_root_path = Path(static_root_path)
     static_root_path.mkdir(parents=True, exist_ok=True)
+    loader_js = static_root_path / "vs" / "loader.js"
+    # read (and validate) the cache once, for all the checks below
+    cached = _get_cached_details(static_root_path=static_root_path)
+    if _has_pinned_version(cached, loader_js):
+        # the pinned version's files never change, nothing to check
+        LOG.info("Monaco editor files are up-to-date.")
+        return
     try:
-        details = _get_package_details(static_root_path)
+        details = _get_package_details(static_root_path, cached)
     except BaseException as error:
         LOG.error("Failed to get the latest version of monaco: %s", error)
         raise RuntimeError(
             "Failed to get the latest version of monaco."
         ) from error
-    current_version, url, sha_sum = details
-    loader_js = static_root_path / "vs" / "loader.js"
+    downloaded = False
     if not loader_js.exists():
         LOG.info("Downloading monaco editor files...")
         try:
@@ -67,51 +108,119 @@ def ensure_extra_static_files(static_root_path: str | Path) -> None:
             raise RuntimeError(
                 "Failed to download monaco editor files."
             ) from error
+        downloaded = True
     if not loader_js.exists():
         LOG.error("Monaco editor files not found.")
         LOG.error("Path: %s", static_root_path)
         LOG.error("Files: %s", os.listdir(static_root_path))
         raise RuntimeError("Failed to download monaco editor files.")
-    with open(
-        static_root_path / DETAILS_JSON,
-        "w",
-        encoding="utf-8",
-        newline="\n",
-    ) as file:
-        json.dump(
-            {
-                "last_check": datetime.now(timezone.utc).isoformat(),
-                "version": current_version,
-                "url": url,
-                "sha_sum": sha_sum,
-            },
-            file,
-            indent=4,
-        )
+    if not _is_up_to_date(cached, details, downloaded):
+        _write_details(static_root_path, details)
     LOG.info("Monaco editor files are up-to-date.")
 
 
-def _get_package_details(static_root_path: Path) -> tuple[str, str, str]:
+def _has_pinned_version(
+    cached: dict[str, Any] | None,
+    loader_js: Path,
+) -> bool:
+    """Check if the pinned version's files are already in place.
+
+    Parameters
+    ----------
+    cached : dict[str, Any] | None
+        The cached details (if any and valid).
+    loader_js : Path
+        The path to the monaco loader.js file.
+
+    Returns
+    -------
+    bool
+        True if a version is pinned, it is the cached one
+        and its files exist, False otherwise.
+    """
+    return bool(
+        PINNED_VERSION
+        and cached
+        and cached["version"] == PINNED_VERSION
+        and loader_js.exists()
+    )
+
+
+def _is_up_to_date(
+    cached: dict[str, Any] | None,
+    details: tuple[str, str, str, str, str],
+    downloaded: bool,
+) -> bool:
+    """Check if the cached details file can be kept as it is.
+
+    Parameters
+    ----------
+    cached : dict[str, Any] | None
+        The cached details (if any and valid).
+    details : tuple[str, str, str, str, str]
+        The current version, url, SHA-1 sum, ETag and Last-Modified.
+    downloaded : bool
+        Whether the files were just downloaded.
+
+    Returns
+    -------
+    bool
+        True if the details were served from the (still fresh)
+        cache, so there is nothing to rewrite, False otherwise.
+    """
+    return bool(
+        cached
+        and not downloaded
+        and _is_fresh(cached)
+        and details == _as_details(cached)
+    )
+
+
+def _get_package_details(
+    static_root_path: Path,
+    cached: dict[str, Any] | None,
+) -> tuple[str, str, str, str, str]:
     """Get details about the target version of monaco editor.
 
     Parameters
     ----------
     static_root_path : Path
         The path to the static files directory.
+    cached : dict[str, Any] | None
+        The cached details (if any and valid).
 
     Returns
     -------
-    tuple[str, str, str]
-        The target version, download url, and SHA-1 sum.
+    tuple[str, str, str, str, str]
+        The target version, download url, SHA-1 sum, and the registry's
+        ETag and Last-Modified response headers (empty if not known).
     """
-    cached_details: tuple[str, str, str] | None = _get_cached_details(
-        static_root_path=static_root_path,
-    )
-    if cached_details:
-        if not PINNED_VERSION or PINNED_VERSION == cached_details[0]:
+    cached_details: tuple[str, str, str, str, str] | None = None
+    if cached and (not PINNED_VERSION or PINNED_VERSION == cached["version"]):
+        cached_details = _as_details(cached)
+        if _is_fresh(cached):
             return cached_details
-    http = urllib3.PoolManager()
-    response = http.request("GET", f"{REGISTRY_BASE_URL}/{PACKAGE_NAME}")
+    http = _get_http()
+    # (request headers replace the pool's defaults, not extend them)
+    headers: dict[str, str] = dict(http.headers)
+    # the abbreviated metadata (dist-tags, versions' dist info)
+    # is all we need and a lot smaller than the full document
+    headers["Accept"] = NPM_ABBREVIATED_METADATA
+    # the JSON compresses well (urllib3 decodes it for us), unlike
+    # the tarball, that is already gzipped: only asked for here
+    headers["Accept-Encoding"] = "gzip"
+    if cached_details:
+        # only a freshness check: let the registry tell us (304)
+        # if nothing changed since the last time we got the metadata
+        if cached_details[3]:
+            headers["If-None-Match"] = cached_details[3]
+        if cached_details[4]:
+            headers["If-Modified-Since"] = cached_details[4]
+    response = http.request(
+        "GET", f"{REGISTRY_BASE_URL}/{PACKAGE_NAME}", headers=headers
+    )
+    if response.status == 304 and cached_details:
+        return cached_details
     data = json.loads(response.data)
     target_version = data["dist-tags"]["latest"]
     if PINNED_VERSION and PINNED_VERSION in data["versions"]:
@@ -119,79 +228,205 @@ def _get_package_details(static_root_path: Path) -> tuple[str, str, str]:
     target_version_data = data["versions"][target_version]
     url = target_version_data["dist"]["tarball"]
     sha_sum = target_version_data["dist"]["shasum"]
-    return target_version, url, sha_sum
+    if not cached or (cached["version"], cached["sha_sum"]) != (
+        target_version,
+        sha_sum,
+    ):
+        # a different version: force a new download
+        _remove_loader_js(static_root_path)
+    return (
+        target_version,
+        url,
+        sha_sum,
+        response.headers.get("ETag", ""),
+        response.headers.get("Last-Modified", ""),
+    )
 
 
 def _download_monaco_editor(
-    details: tuple[str, str, str],
+    details: tuple[str, str, str, str, str],
     static_dir: str | Path,
 ) -> None:
     """Download and extract the monaco editor files.
 
     Parameters
     ----------
-    details : tuple[str, str, str]
-        The version, download url, and SHA-1 sum.
+    details : tuple[str, str, str, str, str]
+        The version, download url, SHA-1 sum, ETag and Last-Modified.
 
     static_dir : str | Path
         The path to the static files directory.
     """
-    http = urllib3.PoolManager()
+    http = _get_http()
     version_url, version_sha_sum = details[1], details[2]
-    response = http.request("GET", version_url)
-    # noinspection InsecureHash
-    sha_sum = hashlib.sha1(response.data, usedforsecurity=False).hexdigest()
-    if sha_sum != version_sha_sum:  # pragma: no cover
-        raise ValueError("SHA-1 sum mismatch.")
+    response = http.request("GET", version_url, preload_content=False)
     os.makedirs(static_dir, exist_ok=True)
-    tmp_dir = _extract_monaco_editor_files(response)
+    try:
+        tmp_dir = _extract_monaco_editor_files(
+            response, version_sha_sum, static_dir
+        )
+    finally:
+        response.release_conn()
+    try:
+        _move_extracted(tmp_dir, static_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _move_extracted(tmp_dir: str, static_dir: str | Path) -> None:
+    """Move the extracted files to the static files directory.
+
+    Parameters
+    ----------
+    tmp_dir : str
+        The directory the files were extracted to.
+    static_dir : str | Path
+        The path to the static files directory.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the extracted files are not found.
+    """
     monaco_editor_path = os.path.join(tmp_dir, "package")
     min_vs = os.path.join("min", "vs")
     src_dir = os.path.join(monaco_editor_path, min_vs)
     if not os.path.exists(src_dir):
-        if os.path.exists(monaco_editor_path):
-            shutil.rmtree(monaco_editor_path)
         raise FileNotFoundError("Failed to extract monaco editor files.")
-    dst_dir = os.path.join(static_dir, "vs")
-    if os.path.exists(dst_dir):
-        shutil.rmtree(dst_dir)
-    msg = f"Copying {src_dir} to {dst_dir}"
-    LOG.info(msg)
-    shutil.copytree(src_dir, dst_dir)
+    # same filesystem: just rename, no need to copy the files
+    _replace_dir(src_dir, os.path.join(static_dir, "vs"))
     # min-maps might not exist (e.g. in v0.53.0)
     min_maps = os.path.join(monaco_editor_path, "min-maps")
     if os.path.exists(min_maps):
-        dst_dir = os.path.join(static_dir, "min-maps")
-        if os.path.exists(dst_dir):
-            shutil.rmtree(dst_dir)
-        msg = f"Copying {min_maps} to {dst_dir}"
-        LOG.info(msg)
-        shutil.copytree(min_maps, dst_dir)
-    shutil.rmtree(tmp_dir)
+        _replace_dir(min_maps, os.path.join(static_dir, "min-maps"))
+
+
+def _replace_dir(src_dir: str, dst_dir: str) -> None:
+    """Move a directory to its destination, replacing any existing one.
+
+    Parameters
+    ----------
+    src_dir : str
+        The directory to move.
+    dst_dir : str
+        The destination (on the same filesystem).
+    """
+    if os.path.exists(dst_dir):
+        shutil.rmtree(dst_dir)
+    msg = f"Moving {src_dir} to {dst_dir}"
+    LOG.info(msg)
+    os.replace(src_dir, dst_dir)
+
+
+class _HashingReader(io.RawIOBase):
+    """Read the response in chunks, updating the hash as we go."""
 
+    def __init__(self, response: urllib3.BaseHTTPResponse) -> None:
+        super().__init__()
+        self._response = response
+        # noinspection InsecureHash
+        self.hash = hashlib.sha1(usedforsecurity=False)
 
-def _extract_monaco_editor_files(response: urllib3.BaseHTTPResponse) -> str:
-    """Extract the monaco editor files.
+    def readable(self) -> bool:
+        """Check if the stream is readable.
+
+        Returns
+        -------
+        bool
+            Always True.
+        """
+        return True
+
+    def readinto(self, buffer: "WriteableBuffer") -> int:
+        """Read the next chunk into the buffer.
+
+        Parameters
+        ----------
+        buffer : WriteableBuffer
+            The buffer to fill.
+
+        Returns
+        -------
+        int
+            The number of bytes read (0 on EOF).
+        """
+        view = memoryview(buffer).cast("B")
+        chunk = self._response.read(len(view))
+        size = len(chunk)
+        view[:size] = chunk
+        self.hash.update(chunk)
+        return size
+
+
+def _extract_monaco_editor_files(
+    response: urllib3.BaseHTTPResponse,
+    expected_sha_sum: str,
+    static_dir: str | Path,
+) -> str:
+    """Extract the monaco editor files while downloading them.
 
     Parameters
     ----------
     response : urllib3.BaseHTTPResponse
-        The response object.
+        The (not preloaded) response object.
+    expected_sha_sum : str
+        The expected SHA-1 sum of the tarball.
+    static_dir : str | Path
+        The static files directory (the extraction happens
+        in a temporary directory inside it).
 
     Returns
     -------
     str
         The path to the extracted files.
+
+    Raises
+    ------
+    ValueError
+        If the SHA-1 sum of the tarball does not match.
     """
-    tmp_dir = tempfile.mkdtemp()
-    with tarfile.open(fileobj=io.BytesIO(response.data)) as tar:
-        if _has_filter_parameter():
-            tar.extractall(path=tmp_dir, filter="data")  # nosemgrep # nosec
-        else:
-            tar.extractall(path=tmp_dir)  # nosemgrep # nosec
+    tmp_dir = tempfile.mkdtemp(prefix=".monaco-", dir=static_dir)
+    reader = _HashingReader(response)
+    try:
+        _stream_extract(reader, tmp_dir)
+    except BaseException:
+        # (e.g. a connection reset or a truncated stream): do not leave
+        # a partial tree behind, inside the served static files
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    if reader.hash.hexdigest() != expected_sha_sum:  # pragma: no cover
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise ValueError("SHA-1 sum mismatch.")
     return tmp_dir
 
 
+def _stream_extract(reader: _HashingReader, tmp_dir: str) -> None:
+    """Extract the members we keep while reading the tarball.
+
+    Parameters
+    ----------
+    reader : _HashingReader
+        The (hashing) reader of the response.
+    tmp_dir : str
+        The directory to extract the files to.
+    """
+    with tarfile.open(fileobj=reader, mode="r|gz", bufsize=CHUNK_SIZE) as tar:
+        # one member at a time, as it comes out of the stream:
+        # anything we would delete right after the move is never written
+        for member in tar:
+            if not member.name.startswith(_KEEP_MEMBERS):
+                continue
+            if _HAS_FILTER_PARAMETER:
+                tar.extract(  # nosemgrep # nosec
+                    member, path=tmp_dir, filter="data"
+                )
+            else:
+                tar.extract(member, path=tmp_dir)  # nosemgrep # nosec
+    # the hash is over the whole tarball (including any trailing padding)
+    while reader.read(CHUNK_SIZE):
+        pass
+
+
 def _remove_loader_js(static_root_path: Path) -> None:
     """Remove loader.js if it exists."""
     loader_js = static_root_path / "vs" / "loader.js"
@@ -202,9 +437,92 @@ def _remove_loader_js(static_root_path: Path) -> None:
             pass
 
 
+def _write_details(
+    static_root_path: Path,
+    details: tuple[str, str, str, str, str],
+) -> None:
+    """Write the details json file (atomically).
+
+    Parameters
+    ----------
+    static_root_path : Path
+        The path to the static files directory.
+    details : tuple[str, str, str, str, str]
+        The version, url, SHA-1 sum, ETag and Last-Modified to store.
+    """
+    version, url, sha_sum, etag, last_modified = details
+    details_file = static_root_path / DETAILS_JSON
+    # a unique temp file: other processes might share the static path
+    fd, tmp_file = tempfile.mkstemp(
+        dir=static_root_path, prefix=DETAILS_JSON, suffix=".tmp"
+    )
+    try:
+        with open(fd, "w", encoding="utf-8", newline="\n") as file:
+            json.dump(
+                {
+                    "last_check": datetime.now(timezone.utc).isoformat(),
+                    "version": version,
+                    "url": url,
+                    "sha_sum": sha_sum,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                },
+                file,
+                indent=4,
+            )
+        # a crash mid-write never leaves a partial details file behind
+        os.replace(tmp_file, details_file)
+    except BaseException:
+        Path(tmp_file).unlink(missing_ok=True)
+        raise
+
+
+def _as_details(cached: dict[str, Any]) -> tuple[str, str, str, str, str]:
+    """Get the details tuple from the cached details.
+
+    Parameters
+    ----------
+    cached : dict[str, Any]
+        The cached details.
+
+    Returns
+    -------
+    tuple[str, str, str, str, str]
+        The version, url, SHA-1 sum, ETag and Last-Modified.
+    """
+    return (
+        cached["version"],
+        cached["url"],
+        cached["sha_sum"],
+        cached.get("etag", ""),
+        cached.get("last_modified", ""),
+    )
+
+
+def _is_fresh(cached: dict[str, Any]) -> bool:
+    """Check if the cached details can be used without asking the registry.
+
+    Parameters
+    ----------
+    cached : dict[str, Any]
+        The cached details.
+
+    Returns
+    -------
+    bool
+        True if the version is pinned or the last check is
+        less than a day old, False otherwise.
+    """
+    # a pinned version's url and shasum do not change: no need to check
+    if PINNED_VERSION:
+        return True
+    age = datetime.now(timezone.utc) - cached["last_check"]
+    return age < timedelta(days=1)
+
+
 def _get_cached_details(
     static_root_path: Path,
-) -> tuple[str, str, str] | None:
+) -> dict[str, Any] | None:
     """Get the cached details of the monaco editor.
 
     Parameters
@@ -214,8 +532,9 @@ def _get_cached_details(
 
     Returns
     -------
-    tuple[str, str, str], optional
-        The target version, download url, and SHA-1 sum.
+    dict[str, Any], optional
+        The cached version, url, sha_sum, etag, last_modified
+        and last_check (as a datetime), if valid.
     """
     details_file = static_root_path / DETAILS_JSON
     # pylint: disable=broad-except, too-many-try-statements
@@ -235,35 +554,19 @@ def _get_cached_details(
             if not all((local_version, url, sha_sum)):
                 _remove_loader_js(static_root_path)
                 return None
-            if datetime.now(timezone.utc) - last_check < timedelta(days=1):
-                return local_version, url, sha_sum
+            return {
+                "version": local_version,
+                "url": url,
+                "sha_sum": sha_sum,
+                "etag": data.get("etag") or "",
+                "last_modified": data.get("last_modified") or "",
+                "last_check": last_check,
+            }
     except BaseException:  # pragma: no cover
         pass
     _remove_loader_js(static_root_path)
     return None
 
 
-def _has_filter_parameter() -> bool:  # pragma: no cover
-    """Check if the tarfile.extractall method has the filter parameter.
-
-    Returns
-    -------
-    bool
-        True if the filter parameter is available, False otherwise.
-    """
-    # Changed in version 3.10.12: Added the filter parameter.
-    # Changed in version 3.11.4: Added the filter parameter.
-    # Changed in version 3.12: Added the filter parameter.
-    py_minor = sys.version_info.minor
-    if py_minor >= 12:
-        return True
-    py_micro = sys.version_info.micro
-    if version.parse("3.10.12") <= version.parse(f"3.{py_minor}.{py_micro}"):
-        return True
-    if version.parse("3.11.4") <= version.parse(f"3.{py_minor}.{py_micro}"):
-        return True
-    return False
-
-
 if __name__ == "__main__":
-    print(_has_filter_parameter())
+    print(_HAS_FILTER_PARAMETER)
@@ -16,15 +16,33 @@ POST:
     The response will contain the list of files that were exported.
 """
 
+import asyncio
 import json
 import os
+import stat
+import time
+from collections import OrderedDict
 from collections.abc import Awaitable
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from jupyter_server.base.handlers import APIHandler
 from tornado.web import HTTPError, authenticated
-from waldiez import WaldiezExporter
+
+if TYPE_CHECKING:
+    from waldiez import Waldiez, WaldiezExporter
+
+_WALDIEZ_SUFFIX = ".waldiez"
+MAX_MISSING_FILES = 256
+# a list of file paths and an extension, no need for more
+MAX_POST_BODY_SIZE = 1024 * 1024
+IMAGE_CHUNK_SIZE = 64 * 1024
+SMALL_IMAGE_SIZE = 16 * 1024
+MISSING_FILES_TTL = 2.0  # seconds
+
+# (root_dir, file) -> when it was last found missing (time.monotonic())
+_MISSING_FILES: OrderedDict[tuple[str, str], float] = OrderedDict()
 
 # pylint: disable=broad-exception-caught
 
@@ -70,7 +88,7 @@ class FilesHandler(APIHandler):
             raise HTTPError(400, reason="No args in request")
         view_arg = self.get_query_argument("view", None)
         if view_arg:
-            self._send_image(view_arg)
+            await self._send_image(view_arg)
             return
         path_arg = self.get_query_argument("path", None)
         if not path_arg:
@@ -99,19 +117,20 @@ class FilesHandler(APIHandler):
             "extension": "py"
         }
         """
-        try:
-            files, target_extension = self._gather_post_data()
-        except HTTPError as error:
-            raise error
+        files, target_extension = self._gather_post_data()
         if not files:
             raise HTTPError(400, reason="No valid files in the request")
-        results = self._handle_export(files, target_extension)
+        results = await self._handle_export(files, target_extension)
         self.log.info("Exported: %s", results)
         await self.finish(json.dumps({"files": results}))
 
-    def _send_image(self, file_path: str) -> None:
+    async def _send_image(self, file_path: str) -> None:
         """Send an image file.
 
+        Larger images are streamed in chunks, not read
+        into memory as a whole. If the client already has
+        the same version (If-None-Match), a 304 is sent.
+
         Parameters
         ----------
         file_path : str
@@ -121,10 +140,34 @@ class FilesHandler(APIHandler):
             actual_file_path = self._get_file_path(file_path)
         except FileNotFoundError as error:
             raise HTTPError(404, reason=str(error)) from error
-        with open(actual_file_path, "rb") as image_file:
+        try:
+            # pylint: disable=consider-using-with
+            image_file = open(actual_file_path, "rb")
+        except OSError as error:
+            # a stale cached lookup (the file was removed since)
+            invalidate_file_paths()
+            reason = f"File not found: {file_path}"
+            raise HTTPError(404, reason=reason) from error
+        with image_file:
+            file_stat = os.fstat(image_file.fileno())
+            size = file_stat.st_size
+            # cheap validator: the frontend re-requests the same
+            # previews often, let it use its cached copy
+            self.set_header("Etag", f'"{size:x}-{file_stat.st_mtime_ns:x}"')
+            if self.check_etag_header():
+                self.set_status(304)
+                return
             self.set_header("Content-Type", "image/png")
-            self.write(image_file.read())
-            self.flush()
+            self.set_header("Content-Length", str(size))
+            if size <= SMALL_IMAGE_SIZE:
+                # not worth the extra flushes
+                self.write(image_file.read())
+            else:
+                while chunk := image_file.read(IMAGE_CHUNK_SIZE):
+                    self.write(chunk)
+                    await self.flush()
+        # (APIHandler.finish would set the json content type otherwise)
+        await self.finish(set_content_type="image/png")
         self.log.info("Sent image: %s", file_path)
 
     def _gather_post_data(self) -> tuple[list[str], str]:
@@ -140,6 +183,12 @@ class FilesHandler(APIHandler):
         ValueError
             If the request data is invalid
         """
+        # fail fast, before parsing anything
+        body_size = len(self.request.body)
+        if not body_size:
+            raise HTTPError(400, reason="No data in request")
+        if body_size > MAX_POST_BODY_SIZE:
+            raise HTTPError(413, reason="Request body too large")
         input_data = self.get_json_body()
         if not input_data:
             raise HTTPError(400, reason="No data in request")
@@ -155,7 +204,7 @@ class FilesHandler(APIHandler):
                 files_list.append(file)
         try:
             return self._get_file_paths(files_list), target_extension
-        except BaseException as error:
+        except (OSError, ValueError) as error:
             raise HTTPError(400, reason="Error getting file paths") from error
 
     def _get_file_path(self, file: str) -> Path:
@@ -176,12 +225,7 @@ class FilesHandler(APIHandler):
         FileNotFoundError
             If the file is not found.
         """
-        if os.path.exists(file) and os.path.isfile(file):
-            return Path(os.path.abspath(file))
-        joined = os.path.join(self.contents_manager.root_dir, file)
-        if os.path.exists(joined) and os.path.isfile(joined):
-            return Path(os.path.abspath(joined))
-        raise FileNotFoundError(f"File not found: {file}")
+        return _find_file(file, self.contents_manager.root_dir)
 
     def _get_file_paths(self, files: list[str]) -> list[str]:
         """Get the actual paths of the files.
@@ -195,38 +239,53 @@ class FilesHandler(APIHandler):
         list[str]
             The list of actual paths of the files.
         """
+        root_dir = self.contents_manager.root_dir
         file_paths: list[str] = []
+        # each file is looked up and exported once,
+        # even if requested more than once
+        requested: set[str] = set()
+        found: set[str] = set()
         for file in files:
-            if not file.endswith(".waldiez"):
+            # the (cheap) checks first, before any stat call
+            if not file.endswith(_WALDIEZ_SUFFIX) or file in requested:
                 continue
+            requested.add(file)
             try:
-                actual_file_path = self._get_file_path(file)
-            except BaseException as error:
+                file_path = str(_find_file(file, root_dir))
+            except FileNotFoundError as error:
                 self.log.error("Error getting file path: %s", error)
                 continue
-            file_paths.append(str(actual_file_path))
+            if file_path not in found:
+                found.add(file_path)
+                file_paths.append(file_path)
         return file_paths
 
     @staticmethod
-    def _relative_to_cwd(file_path: Path) -> str:
+    def _relative_to_cwd(file_path: str | os.PathLike[str]) -> str:
         """Get the relative path to the current working directory.
 
         Parameters
         ----------
-        file_path : Path
-            The path to the file.
+        file_path : str | os.PathLike[str]
+            The (resolved) path to the file.
 
         Returns
         -------
         str
             The relative path to the current working directory.
         """
-        file_path_str = str(file_path).replace(str(Path.cwd().resolve()), "")
-        if file_path_str.startswith(os.path.sep):
-            file_path_str = file_path_str[len(os.path.sep) :]
-        return file_path_str
-
-    def _to_py(self, exporter: WaldiezExporter, file_path: Path) -> str:
+        path = os.fspath(file_path)
+        # plain string ops (the path and the cwd are both resolved):
+        # cheaper than pathlib's relative_to
+        prefix = _resolved_cwd(os.getcwd())
+        if not prefix.endswith(os.sep):
+            prefix += os.sep
+        if path.startswith(prefix):
+            return path[len(prefix) :]
+        # not under the current working directory
+        return path
+
+    def _to_py(self, exporter: "WaldiezExporter", file_path: Path) -> str:
         """Export the file to Python code.
 
         Parameters
@@ -243,12 +302,12 @@ class FilesHandler(APIHandler):
         """
         try:
             exporter.export(file_path, force=True)
-        except BaseException as error:
+        except Exception as error:
             self.log.error("Error exporting to .py: %s", error)
             return ""
         return self._relative_to_cwd(file_path)
 
-    def _to_ipynb(self, exporter: WaldiezExporter, file_path: Path) -> str:
+    def _to_ipynb(self, exporter: "WaldiezExporter", file_path: Path) -> str:
         """Export the file to Jupyter Notebook format.
 
         Parameters
@@ -265,18 +324,18 @@ class FilesHandler(APIHandler):
         """
         try:
             exporter.export(file_path, force=True)
-        except BaseException as error:
+        except Exception as error:
             self.log.error("Error exporting to .ipynb: %s", error)
             return ""
         return self._relative_to_cwd(file_path)
 
-    def _export_file(self, file: str, target_extension: str) -> str:
+    def _export_file(self, file_path: Path, target_extension: str) -> str:
         """§Export a single file to the specified extension.
 
         Parameters
         ----------
-        file : str
-            The file to export.
+        file_path : Path
+            The (resolved) path of the file to export.
         target_extension : str
             The target extension to export to.
 
@@ -285,26 +344,31 @@ class FilesHandler(APIHandler):
         str
             The path of the exported file.
         """
-        file_path = Path(file).resolve()
         try:
-            exporter = WaldiezExporter.load(file_path)
-        except BaseException as error:
+            file_stat = os.stat(file_path)
+            exporter = _get_exporter(
+                str(file_path), file_stat.st_mtime_ns, file_stat.st_size
+            )
+        except Exception as error:
+            # the per-file boundary: an invalid/unreadable file
+            # must not fail the other files' exports
             self.log.error("Error loading file: %s", error)
             return ""
         if target_extension == "py":
-            file_path = file_path.with_suffix(".py")
-            return self._to_py(exporter, file_path)
+            return self._to_py(exporter, file_path.with_suffix(".py"))
         if target_extension == "ipynb":
-            file_path = file_path.with_suffix(".ipynb")
-            return self._to_ipynb(exporter, file_path)
+            return self._to_ipynb(exporter, file_path.with_suffix(".ipynb"))
         self.log.error("Invalid target extension: %s", target_extension)
         return ""
 
-    def _handle_export(
+    async def _handle_export(
         self, files: list[str], target_extension: str
     ) -> list[str]:
         """Handle the export.
 
+        The files are exported in worker threads (concurrently if more
+        than one), so the event loop is not blocked meanwhile.
+
         Parameters
         ----------
         files : list[str]
@@ -317,17 +381,239 @@ class FilesHandler(APIHandler):
         list[str]
             The list of files that were exported.
         """
-        file_paths: list[str] = []
+        # (a dict: de-duplicated, in the requested order)
+        valid_files: dict[Path, None] = {}
         for file in files:
+            # the (cheap) string check first, before resolving/stat-ing
+            if not file.endswith(_WALDIEZ_SUFFIX):
+                self.log.error("Invalid file: %s", file)
+                continue
             file_path = Path(file).resolve()
-            if not file_path.is_file() or file_path.suffix != ".waldiez":
+            if file_path.suffix != _WALDIEZ_SUFFIX or not _is_regular_file(
+                str(file_path)
+            ):
                 self.log.error("Invalid file: %s", file)
                 continue
-            converted = self._export_file(file, target_extension)
-            if converted:
-                file_paths.append(converted)
+            valid_files[file_path] = None
+        if not valid_files:
+            self.log.error("No files were exported")
+            return []
+        loop = asyncio.get_running_loop()
+        # (the loop's default executor, shared by all the requests)
+        # one failing file does not affect the others:
+        # _export_file logs the error and returns ""
+        converted_files = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    None,
+                    self._export_file,
+                    file_path,
+                    target_extension,
+                )
+                for file_path in valid_files
+            )
+        )
+        file_paths = [converted for converted in converted_files if converted]
         if not file_paths:
             self.log.error("No files were exported")
             return []
+        invalidate_file_paths()
         self.log.debug("Exported files: %s", file_paths)
         return file_paths
+
+
+def _get_exporter(
+    file_path: str, mtime_ns: int, size: int
+) -> "WaldiezExporter":
+    """Get a new exporter for a .waldiez file, using the cached flow.
+
+    Exports can run concurrently (in worker threads):
+    only the parsed flow is shared, not the exporter.
+
+    Parameters
+    ----------
+    file_path : str
+        The (resolved) path of the file.
+    mtime_ns : int
+        The file's modification time.
+    size : int
+        The file's size.
+
+    Returns
+    -------
+    WaldiezExporter
+        The exporter instance.
+    """
+    # deferred: importing waldiez is slow, only pay for it when needed
+    # pylint: disable=import-outside-toplevel
+    from waldiez import WaldiezExporter
+
+    return WaldiezExporter(_load_flow(file_path, mtime_ns, size))
+
+
+@lru_cache(maxsize=32)
+def _load_flow(  # pylint: disable=unused-argument
+    file_path: str, mtime_ns: int, size: int
+) -> "Waldiez":
+    """Load (and cache) the flow of a .waldiez file.
+
+    Parameters
+    ----------
+    file_path : str
+        The (resolved) path of the file.
+    mtime_ns : int
+        The file's modification time, only part of the cache key:
+        an edited file is loaded again.
+    size : int
+        The file's size, also only part of the cache key.
+
+    Returns
+    -------
+    Waldiez
+        The parsed flow.
+    """
+    # pylint: disable=import-outside-toplevel
+    from waldiez import Waldiez
+
+    return Waldiez.load(Path(file_path))
+
+
+@lru_cache(maxsize=1)
+def _resolved_cwd(cwd: str) -> str:
+    """Resolve the current working directory (once per cwd).
+
+    Parameters
+    ----------
+    cwd : str
+        The current working directory.
+
+    Returns
+    -------
+    str
+        The resolved current working directory.
+    """
+    return os.path.realpath(cwd)
+
+
+def invalidate_file_paths() -> None:
+    """Forget the cached file path lookups (found and missing).
+
+    To be called after writing files (uploads, exports).
+    """
+    _lookup_file.cache_clear()
+    _MISSING_FILES.clear()
+
+
+def _find_file(file: str, root_dir: str) -> Path:
+    """Find a file, remembering (for a while) the ones not found.
+
+    Parameters
+    ----------
+    file : str
+        The file path.
+    root_dir : str
+        The server's root directory.
+
+    Returns
+    -------
+    Path
+        The absolute path of the file.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file is not found.
+    """
+    key = (root_dir, file)
+    missed_at = _MISSING_FILES.get(key)
+    if missed_at is not None:
+        if time.monotonic() - missed_at < MISSING_FILES_TTL:
+            raise FileNotFoundError(f"File not found: {file}")
+        del _MISSING_FILES[key]
+    found = _lookup_or_remember_missing(file, root_dir)
+    if not _is_regular_file(str(found)):
+        # removed or renamed since (e.g. from jupyter's file browser)
+        _lookup_file.cache_clear()
+        found = _lookup_or_remember_missing(file, root_dir)
+    return found
+
+
+def _lookup_or_remember_missing(file: str, root_dir: str) -> Path:
+    """Look up a file, remembering it if it is not found.
+
+    Parameters
+    ----------
+    file : str
+        The file path.
+    root_dir : str
+        The server's root directory.
+
+    Returns
+    -------
+    Path
+        The absolute path of the file.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file is not found.
+    """
+    try:
+        return _lookup_file(file, root_dir)
+    except FileNotFoundError:
+        _MISSING_FILES[(root_dir, file)] = time.monotonic()
+        if len(_MISSING_FILES) > MAX_MISSING_FILES:
+            _MISSING_FILES.popitem(last=False)
+        raise
+
+
+@lru_cache(maxsize=512)
+def _lookup_file(file: str, root_dir: str) -> Path:
+    """Look up a file, either as given or relative to the root directory.
+
+    The lookups are cached: repeated requests for the same
+    file (view, open, export) only need a single stat to
+    confirm that the cached path is still there.
+
+    Parameters
+    ----------
+    file : str
+        The file path.
+    root_dir : str
+        The server's root directory.
+
+    Returns
+    -------
+    Path
+        The absolute path of the file.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file is not found.
+    """
+    if _is_regular_file(file):
+        return Path(os.path.abspath(file))
+    joined = os.path.join(root_dir, file)
+    if _is_regular_file(joined):
+        return Path(os.path.abspath(joined))
+    raise FileNotFoundError(f"File not found: {file}")
+
+
+def _is_regular_file(path: str) -> bool:
+    """Check if the path is an (existing) regular file, with a single stat.
+
+    Parameters
+    ----------
+    path : str
+        The path to check.
+
+    Returns
+    -------
+    bool
+        True if the path exists and is a regular file, False otherwise.
+    """
+    try:
+        return stat.S_ISREG(os.stat(path).st_mode)
+    except (OSError, ValueError):
+        return False
@@ -7,7 +7,6 @@ from collections.abc import Awaitable
 
 from jupyter_server.base.handlers import APIHandler
 from tornado.web import authenticated
-from waldiez import WaldiezRunner
 
 
 class InterruptHandler(APIHandler):
@@ -40,7 +39,10 @@ class InterruptHandler(APIHandler):
         HTTPError
             If the request data is invalid.
         """
-        # pylint: disable=broad-exception-caught
+        # pylint: disable=broad-exception-caught,import-outside-toplevel
+        # deferred: importing waldiez is slow, only pay for it when needed
+        from waldiez import WaldiezRunner
+
         try:
             _, msg = WaldiezRunner.gather()
             self.log.debug(msg)
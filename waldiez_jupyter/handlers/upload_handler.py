@@ -3,6 +3,7 @@
 
 """Handle file uploads."""
 
+import asyncio
 import json
 import os
 from pathlib import Path
@@ -11,22 +12,26 @@ from jupyter_server.base.handlers import APIHandler
 from pathvalidate import sanitize_filename
 from tornado.web import HTTPError
 
-ALLOWED_EXTENSIONS = {
-    ".txt",
-    ".pdf",
-    ".doc",
-    ".docx",
-    ".rtf",
-    ".xlsx",
-    ".xls",
-    ".csv",
-    ".json",
-    ".yaml",
-    ".yml",
-    ".xml",
-    ".md",
-    ".odt",
-}
+from .files_handler import invalidate_file_paths
+
+ALLOWED_EXTENSIONS = frozenset(
+    {
+        ".txt",
+        ".pdf",
+        ".doc",
+        ".docx",
+        ".rtf",
+        ".xlsx",
+        ".xls",
+        ".csv",
+        ".json",
+        ".yaml",
+        ".yml",
+        ".xml",
+        ".md",
+        ".odt",
+    }
+)
 
 
 class UploadHandler(APIHandler):
@@ -64,12 +69,14 @@ class UploadHandler(APIHandler):
         # make sure the filename is safe (no extra dots, slashes, etc.)
         filename = sanitize_filename(file["filename"])
         # make sure the file extension is allowed
-        if not is_allowed_extension(filename):
+        extension = os.path.splitext(filename)[1].lower()
+        if extension not in ALLOWED_EXTENSIONS:
             raise HTTPError(400, reason="File extension not allowed")
         # save the file
         file_path = self._get_file_path(filename)
-        with open(file_path, "wb") as file_obj:
-            file_obj.write(file["body"])
+        # do not block the event loop while writing (possibly large) files
+        await asyncio.to_thread(_write_bytes, file_path, file["body"])
+        invalidate_file_paths()
         await self.finish(json.dumps({"path": str(file_path)}))
 
     def _get_file_path(self, file_name: str) -> Path:
@@ -84,9 +91,35 @@ class UploadHandler(APIHandler):
         -------
         str
             The actual path of the file (where it will be saved).
+
+        Raises
+        ------
+        HTTPError
+            If the path would be outside the root directory.
         """
-        joined = os.path.join(self.contents_manager.root_dir, file_name)
-        return Path(os.path.abspath(joined))
+        # root_dir is already absolute: string ops only (no getcwd),
+        # just making sure we never end up outside of it
+        root_dir = os.path.normpath(self.contents_manager.root_dir)
+        joined = os.path.normpath(os.path.join(root_dir, file_name))
+        if joined == root_dir or (
+            os.path.commonpath([root_dir, joined]) != root_dir
+        ):
+            raise HTTPError(400, reason="Invalid file name")
+        return Path(joined)
+
+
+def _write_bytes(file_path: Path, data: bytes) -> None:
+    """Write the uploaded data to the file.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path of the file to write.
+    data : bytes
+        The file's content.
+    """
+    with open(file_path, "wb") as file_obj:
+        file_obj.write(data)
 
 
 def is_allowed_extension(filename: str) -> bool:
@@ -102,4 +135,5 @@ def is_allowed_extension(filename: str) -> bool:
     bool
         True if the extension is allowed, False otherwise.
     """
-    return any(filename.endswith(extension) for extension in ALLOWED_EXTENSIONS)
+    # (case-insensitive) a single set lookup, not a scan of all suffixes
+    return os.path.splitext(filename)[1].lower() in ALLOWED_EXTENSIONS
@@ -3,9 +3,13 @@
 
 """Test waldiez_jupyter.handlers.extra_static_files.*."""
 
+import hashlib
+import io
 import json
+import tarfile
+from datetime import datetime, timezone
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -78,3 +82,140 @@ def test_ensure_extra_static_files_no_loader_js(tmp_path: Path) -> None:
     ):
         with pytest.raises(RuntimeError):
             ensure_extra_static_files(static_root_path)
+
+
+def test_ensure_extra_static_files_not_modified(tmp_path: Path) -> None:
+    """Test ensure_extra_static_files with a stale but unchanged cache.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        The temporary path.
+    """
+    static_root_path = tmp_path / "static"
+    loader_js = static_root_path / "vs" / "loader.js"
+    loader_js.parent.mkdir(parents=True, exist_ok=True)
+    loader_js.write_text("// loader")
+    details = {
+        "last_check": "2020-01-01T00:00:00+00:00",
+        "version": "0.0.1",
+        "url": "https://example.com",
+        "sha_sum": "1234567890",
+        "etag": '"abc"',
+        "last_modified": "",
+    }
+    details_json = static_root_path / DETAILS_JSON
+    details_json.write_text(json.dumps(details))
+    http = MagicMock()
+    http.headers = {}
+    http.request.return_value = MagicMock(status=304)
+    with (
+        patch.object(mod, "PINNED_VERSION", None),
+        patch.object(mod, "_get_http", return_value=http),
+        patch.object(mod, "_download_monaco_editor") as download,
+    ):
+        ensure_extra_static_files(static_root_path)
+    download.assert_not_called()
+    assert http.request.call_args.kwargs["headers"]["If-None-Match"] == '"abc"'
+    assert loader_js.exists()
+    new_details = json.loads(details_json.read_text())
+    assert new_details["etag"] == '"abc"'
+    assert new_details["last_check"] != details["last_check"]
+
+
+def test_extract_monaco_editor_files_only_kept_members(tmp_path: Path) -> None:
+    """Test that only vs/ and min-maps/ are extracted from the tarball.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        The temporary path.
+    """
+    tarball = io.BytesIO()
+    with tarfile.open(fileobj=tarball, mode="w:gz") as tar:
+        for name in (
+            "package/min/vs/loader.js",
+            "package/min-maps/vs/loader.js.map",
+            "package/esm/vs/editor.js",
+            "package/README.md",
+        ):
+            info = tarfile.TarInfo(name)
+            info.size = len(name)
+            tar.addfile(info, io.BytesIO(name.encode()))
+    data = tarball.getvalue()
+    # noinspection InsecureHash
+    sha_sum = hashlib.sha1(data, usedforsecurity=False).hexdigest()
+    response = io.BytesIO(data)
+    # pylint: disable=protected-access
+    tmp_dir = Path(
+        mod._extract_monaco_editor_files(
+            response,  # type: ignore[arg-type]
+            sha_sum,
+            tmp_path,
+        )
+    )
+    assert (tmp_dir / "package" / "min" / "vs" / "loader.js").is_file()
+    assert (tmp_dir / "package" / "min-maps" / "vs" / "loader.js.map").is_file()
+    assert not (tmp_dir / "package" / "esm").exists()
+    assert not (tmp_dir / "package" / "README.md").exists()
+
+
+def test_extract_monaco_editor_files_failed_stream(tmp_path: Path) -> None:
+    """Test that a failed (truncated) stream leaves no temporary files.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        The temporary path.
+    """
+    tarball = io.BytesIO()
+    with tarfile.open(fileobj=tarball, mode="w:gz") as tar:
+        for index in range(32):
+            name = f"package/min/vs/file{index}.js"
+            content = hashlib.sha256(name.encode()).digest() * 1024
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    data = tarball.getvalue()
+    response = io.BytesIO(data[: len(data) // 2])
+    # pylint: disable=protected-access
+    with pytest.raises((tarfile.TarError, EOFError, OSError)):
+        mod._extract_monaco_editor_files(
+            response,  # type: ignore[arg-type]
+            "1234567890",
+            tmp_path,
+        )
+    assert not list(tmp_path.glob(".monaco-*"))
+
+
+def test_ensure_extra_static_files_fresh_cache(tmp_path: Path) -> None:
+    """Test that a fresh cache is neither checked nor rewritten.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        The temporary path.
+    """
+    static_root_path = tmp_path / "static"
+    loader_js = static_root_path / "vs" / "loader.js"
+    loader_js.parent.mkdir(parents=True, exist_ok=True)
+    loader_js.write_text("// loader")
+    details = {
+        "last_check": datetime.now(timezone.utc).isoformat(),
+        "version": "0.0.1",
+        "url": "https://example.com",
+        "sha_sum": "1234567890",
+        "etag": "",
+        "last_modified": "",
+    }
+    details_json = static_root_path / DETAILS_JSON
+    details_json.write_text(json.dumps(details))
+    with (
+        patch.object(mod, "PINNED_VERSION", None),
+        patch.object(mod, "_get_http") as get_http,
+        patch.object(mod, "_write_details") as write_details,
+    ):
+        ensure_extra_static_files(static_root_path)
+    get_http.assert_not_called()
+    write_details.assert_not_called()
+    assert json.loads(details_json.read_text()) == details
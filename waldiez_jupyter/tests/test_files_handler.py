@@ -4,13 +4,54 @@
 """Test the handlers."""
 
 import json
-import shutil
+import os
 from pathlib import Path
 from typing import Any, Callable
 
 import pytest
 import tornado
 
+from waldiez_jupyter.handlers.files_handler import (
+    FilesHandler,
+    _find_file,
+    invalidate_file_paths,
+)
+
+
+def _json_body(payload: dict[str, Any]) -> bytes:
+    """Encode a request's json body.
+
+    Parameters
+    ----------
+    payload : dict[str, Any]
+        The request's payload.
+
+    Returns
+    -------
+    bytes
+        The encoded body (``json.dumps`` escapes non-ascii characters).
+    """
+    return json.dumps(payload).encode("ascii")
+
+
+def _without_cell_ids(notebook: bytes) -> dict[str, Any]:
+    """Parse a notebook, dropping the (random) cell ids.
+
+    Parameters
+    ----------
+    notebook : bytes
+        The notebook's content.
+
+    Returns
+    -------
+    dict[str, Any]
+        The parsed notebook, without cell ids.
+    """
+    parsed: dict[str, Any] = json.loads(notebook)
+    for cell in parsed.get("cells", []):
+        cell.pop("id", None)
+    return parsed
+
 
 async def test_get_file_no_path(jp_fetch: Callable[..., Any]) -> None:
     """Test the GET file handler without a path.
@@ -58,17 +99,15 @@ async def test_get_file(
         params={"path": "example.waldiez"},
     )
     assert response.code == 200
-    expected = {"path": str(file_path)}
-    assert response.body == json.dumps(expected).encode("utf-8")
+    assert json.loads(response.body) == {"path": str(file_path)}
     file_path.unlink()
 
 
-async def test_export_to_py(
+async def test_view_removed_image(
     jp_fetch: Callable[..., Any],
     jp_root_dir: Path,
-    data_dir: Path,
 ) -> None:
-    """Test exporting a .waldiez file to a .py file.
+    """Test viewing an image that was removed after a (cached) lookup.
 
     Parameters
     ----------
@@ -76,16 +115,97 @@ async def test_export_to_py(
         The Jupyter server fetch function.
     jp_root_dir : Path
         The Jupyter server root directory.
+    """
+    file_path = jp_root_dir / "image.png"
+    file_path.write_bytes(b"\x89PNG")
+    response = await jp_fetch("waldiez", "files", params={"view": "image.png"})
+    assert response.code == 200
+    assert response.headers["Content-Type"] == "image/png"
+    assert response.body == b"\x89PNG"
+    file_path.unlink()
+    with pytest.raises(tornado.httpclient.HTTPClientError) as exc_info:
+        await jp_fetch("waldiez", "files", params={"view": "image.png"})
+    assert exc_info.value.code == 404
+
+
+async def test_view_large_image(
+    jp_fetch: Callable[..., Any],
+    jp_root_dir: Path,
+) -> None:
+    """Test viewing an image that is sent in chunks.
+
+    Parameters
+    ----------
+    jp_fetch : Callable[..., Any]
+        The Jupyter server fetch function.
+    jp_root_dir : Path
+        The Jupyter server root directory.
+    """
+    content = b"\x89PNG" + bytes(range(256)) * 1024
+    file_path = jp_root_dir / "large.png"
+    file_path.write_bytes(content)
+    response = await jp_fetch("waldiez", "files", params={"view": "large.png"})
+    assert response.code == 200
+    assert response.headers["Content-Type"] == "image/png"
+    assert response.headers["Content-Length"] == str(len(content))
+    assert response.body == content
+    file_path.unlink()
+
+
+async def test_view_image_not_modified(
+    jp_fetch: Callable[..., Any],
+    jp_root_dir: Path,
+) -> None:
+    """Test viewing an image with a matching If-None-Match header.
+
+    Parameters
+    ----------
+    jp_fetch : Callable[..., Any]
+        The Jupyter server fetch function.
+    jp_root_dir : Path
+        The Jupyter server root directory.
+    """
+    file_path = jp_root_dir / "cached.png"
+    file_path.write_bytes(b"\x89PNG")
+    response = await jp_fetch("waldiez", "files", params={"view": "cached.png"})
+    etag = response.headers["Etag"]
+    with pytest.raises(tornado.httpclient.HTTPClientError) as exc_info:
+        await jp_fetch(
+            "waldiez",
+            "files",
+            params={"view": "cached.png"},
+            headers={"If-None-Match": etag},
+        )
+    assert exc_info.value.code == 304
+    file_path.unlink()
+
+
+@pytest.mark.usefixtures("waldiez_in_root", "export_artifacts")
+async def test_export_to_py(
+    jp_fetch: Callable[..., Any],
+    data_dir: Path,
+    expected_exports: dict[str, bytes],
+    expected_export_responses: dict[str, dict[str, list[str]]],
+) -> None:
+    """Test exporting a .waldiez file to a .py file.
+
+    Parameters
+    ----------
+    jp_fetch : Callable[..., Any]
+        The Jupyter server fetch function.
     data_dir : Path
         The data directory.
+    expected_exports : dict[str, bytes]
+        The expected content of the exported file, per extension.
+    expected_export_responses : dict[str, dict[str, list[str]]]
+        The expected (parsed) response, per extension.
     """
     waldiez_path = data_dir / "flow.waldiez"
-    shutil.copy(data_dir / "flow.waldiez", jp_root_dir / "flow.waldiez")
     response = await jp_fetch(
         "waldiez",
         "files",
         method="POST",
-        body=json.dumps(
+        body=_json_body(
             {
                 "files": [str(waldiez_path)],
                 "extension": "py",
@@ -94,25 +214,16 @@ async def test_export_to_py(
         request_timeout=60,
     )
     assert response.code == 200
-    relative_to_cwd = waldiez_path.relative_to(Path.cwd())
-    expected = {"files": [str(relative_to_cwd.with_suffix(".py"))]}
-    # expected = {"files": [str(waldiez_path)]}
-    assert response.body == json.dumps(expected).encode("utf-8")
-    assert (data_dir / "flow.py").exists()
-    (data_dir / "flow.py").unlink()
-    (jp_root_dir / "flow.waldiez").unlink()
-    if (data_dir / "waldiez_flow_api_keys.py").exists():  # pragma: no cover
-        (data_dir / "waldiez_flow_api_keys.py").unlink()
-    if (data_dir / "test_flow_api_keys.py").exists():  # pragma: no cover
-        (data_dir / "test_flow_api_keys.py").unlink()
-    if (data_dir / "waldiez_api_keys.py").exists():  # pragma: no cover
-        (data_dir / "waldiez_api_keys.py").unlink()
+    assert json.loads(response.body) == expected_export_responses["py"]
+    assert (data_dir / "flow.py").read_bytes() == expected_exports["py"]
 
 
+@pytest.mark.usefixtures("waldiez_in_root", "export_artifacts")
 async def test_export_to_ipynb(
     jp_fetch: Callable[..., Any],
-    jp_root_dir: Path,
     data_dir: Path,
+    expected_exports: dict[str, bytes],
+    expected_export_responses: dict[str, dict[str, list[str]]],
 ) -> None:
     """Test exporting a .waldiez file to a .ipynb file.
 
@@ -120,18 +231,19 @@ async def test_export_to_ipynb(
     ----------
     jp_fetch : Callable[..., Any]
         The Jupyter server fetch function.
-    jp_root_dir : Path
-        The Jupyter server root directory.
     data_dir : Path
         The data directory.
+    expected_exports : dict[str, bytes]
+        The expected content of the exported file, per extension.
+    expected_export_responses : dict[str, dict[str, list[str]]]
+        The expected (parsed) response, per extension.
     """
     waldiez_path = data_dir / "flow.waldiez"
-    shutil.copy(data_dir / "flow.waldiez", jp_root_dir / "flow.waldiez")
     response = await jp_fetch(
         "waldiez",
         "files",
         method="POST",
-        body=json.dumps(
+        body=_json_body(
             {
                 "files": [str(waldiez_path)],
                 "extension": "ipynb",
@@ -140,25 +252,18 @@ async def test_export_to_ipynb(
         request_timeout=60,
     )
     assert response.code == 200
-    relative_to_cwd = waldiez_path.relative_to(Path.cwd())
-    expected = {"files": [str(relative_to_cwd.with_suffix(".ipynb"))]}
-    # expected = {"files": [str(waldiez_path)]}
-    assert response.body == json.dumps(expected).encode("utf-8")
-    assert (data_dir / "flow.ipynb").exists()
-    (data_dir / "flow.ipynb").unlink()
-    (jp_root_dir / "flow.waldiez").unlink()
-    if (data_dir / "test_flow_api_keys.py").exists():  # pragma: no cover
-        (data_dir / "test_flow_api_keys.py").unlink()
-    if (data_dir / "waldiez_api_keys.py").exists():  # pragma: no cover
-        (data_dir / "waldiez_api_keys.py").unlink()
+    assert json.loads(response.body) == expected_export_responses["ipynb"]
+    assert _without_cell_ids(
+        (data_dir / "flow.ipynb").read_bytes()
+    ) == _without_cell_ids(expected_exports["ipynb"])
 
 
-async def test_export_to_invalid_extension(
+async def test_export_multiple_files(
     jp_fetch: Callable[..., Any],
     jp_root_dir: Path,
-    data_dir: Path,
+    waldiez_flow_bytes: bytes,
 ) -> None:
-    """Test exporting a .waldiez file with an invalid extension.
+    """Test exporting more than one .waldiez files.
 
     Parameters
     ----------
@@ -166,17 +271,57 @@ async def test_export_to_invalid_extension(
         The Jupyter server fetch function.
     jp_root_dir : Path
         The Jupyter server root directory.
+    waldiez_flow_bytes : bytes
+        The content of the test flow.
+    """
+    waldiez_paths = [
+        jp_root_dir / "flow1.waldiez",
+        jp_root_dir / "flow2.waldiez",
+    ]
+    for waldiez_path in waldiez_paths:
+        waldiez_path.write_bytes(waldiez_flow_bytes)
+    response = await jp_fetch(
+        "waldiez",
+        "files",
+        method="POST",
+        body=_json_body(
+            {
+                # (a duplicate is only exported once)
+                "files": [str(waldiez_path) for waldiez_path in waldiez_paths]
+                + [str(waldiez_paths[0])],
+                "extension": "py",
+            }
+        ),
+        request_timeout=60,
+    )
+    assert response.code == 200
+    exported = json.loads(response.body)["files"]
+    assert len(exported) == 2
+    for waldiez_path in waldiez_paths:
+        assert waldiez_path.with_suffix(".py").exists()
+
+
+@pytest.mark.usefixtures("waldiez_in_root", "export_artifacts")
+async def test_export_to_invalid_extension(
+    jp_fetch: Callable[..., Any],
+    data_dir: Path,
+) -> None:
+    """Test exporting a .waldiez file with an invalid extension.
+
+    Parameters
+    ----------
+    jp_fetch : Callable[..., Any]
+        The Jupyter server fetch function.
     data_dir : Path
         The data directory.
     """
     waldiez_path = data_dir / "flow.waldiez"
-    shutil.copy(data_dir / "flow.waldiez", jp_root_dir / "flow.waldiez")
     with pytest.raises(tornado.httpclient.HTTPClientError) as exc_info:
         await jp_fetch(
             "waldiez",
             "files",
             method="POST",
-            body=json.dumps(
+            body=_json_body(
                 {
                     "files": [str(waldiez_path)],
                     "extension": "invalid",
@@ -185,15 +330,13 @@ async def test_export_to_invalid_extension(
         )
     assert exc_info.value.code == 400
     assert exc_info.value.response
-    (jp_root_dir / "flow.waldiez").unlink()
-    if (data_dir / "test_flow_api_keys.py").exists():  # pragma: no cover
-        (data_dir / "test_flow_api_keys.py").unlink()
 
 
+@pytest.mark.usefixtures("export_artifacts")
 async def test_export_from_invalid_extension(
     jp_fetch: Callable[..., Any],
     jp_root_dir: Path,
-    data_dir: Path,
+    waldiez_flow_bytes: bytes,
 ) -> None:
     """Test exporting a file with an invalid extension.
 
@@ -203,17 +346,17 @@ async def test_export_from_invalid_extension(
         The Jupyter server fetch function.
     jp_root_dir : Path
         The Jupyter server root directory.
-    data_dir : Path
-        The data directory.
+    waldiez_flow_bytes : bytes
+        The content of the test flow.
     """
-    waldiez_path = data_dir / "flow.invalid"
-    shutil.copy(data_dir / "flow.waldiez", jp_root_dir / "flow.invalid")
+    waldiez_path = jp_root_dir / "flow.invalid"
+    waldiez_path.write_bytes(waldiez_flow_bytes)
     with pytest.raises(tornado.httpclient.HTTPClientError) as exc_info:
         await jp_fetch(
             "waldiez",
             "files",
             method="POST",
-            body=json.dumps(
+            body=_json_body(
                 {
                     "files": [str(waldiez_path)],
                     "extension": "py",
@@ -221,3 +364,84 @@ async def test_export_from_invalid_extension(
             ),
         )
     assert exc_info.value.code == 400
+
+
+async def test_export_too_large_body(jp_fetch: Callable[..., Any]) -> None:
+    """Test exporting with a request body that is too large.
+
+    Parameters
+    ----------
+    jp_fetch : Callable[..., Any]
+        The Jupyter server fetch function.
+    """
+    with pytest.raises(tornado.httpclient.HTTPClientError) as exc_info:
+        await jp_fetch(
+            "waldiez",
+            "files",
+            method="POST",
+            body=_json_body(
+                {
+                    "files": ["x.waldiez"] * (1024 * 1024 // 10),
+                    "extension": "py",
+                }
+            ),
+        )
+    assert exc_info.value.code == 413
+
+
+def test_find_file_missing_is_remembered(tmp_path: Path) -> None:
+    """Test that a missing file is remembered until the cache is cleared.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        The temporary path.
+    """
+    with pytest.raises(FileNotFoundError):
+        _find_file("later.waldiez", str(tmp_path))
+    (tmp_path / "later.waldiez").write_text("test")
+    with pytest.raises(FileNotFoundError):
+        _find_file("later.waldiez", str(tmp_path))
+    invalidate_file_paths()
+    found = _find_file("later.waldiez", str(tmp_path))
+    assert found == tmp_path / "later.waldiez"
+
+
+def test_find_file_removed_is_not_returned(tmp_path: Path) -> None:
+    """Test that a (cached) file removed since is not returned.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        The temporary path.
+    """
+    file_path = tmp_path / "removed.waldiez"
+    file_path.write_text("test")
+    assert _find_file("removed.waldiez", str(tmp_path)) == file_path
+    file_path.unlink()
+    with pytest.raises(FileNotFoundError):
+        _find_file("removed.waldiez", str(tmp_path))
+
+
+def test_relative_to_cwd(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test making exported paths relative to the cwd.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        The temporary path.
+    monkeypatch : pytest.MonkeyPatch
+        The pytest monkeypatch fixture.
+    """
+    cwd = Path(os.path.realpath(tmp_path))
+    monkeypatch.chdir(cwd)
+    # pylint: disable=protected-access
+    inside = cwd / "sub" / "flow.py"
+    assert FilesHandler._relative_to_cwd(inside) == os.path.join(
+        "sub", "flow.py"
+    )
+    outside = cwd.parent / f"{cwd.name}-other" / "flow.py"
+    assert FilesHandler._relative_to_cwd(str(outside)) == str(outside)
@@ -6,16 +6,56 @@
 import json
 from pathlib import Path
 from typing import Any, Callable
-from uuid import uuid4
 
 import pytest
 import tornado
 
+from waldiez_jupyter.handlers.upload_handler import is_allowed_extension
+
+# not part of any of the uploaded test files
+_BOUNDARY = "waldiezboundary0123456789abcdef"
+
+
+def _multipart_body(
+    boundary: str,
+    filename: str,
+    content_type: str,
+    content: bytes,
+) -> bytes:
+    """Build a multipart/form-data body with a single file.
+
+    Parameters
+    ----------
+    boundary : str
+        The multipart boundary.
+    filename : str
+        The name of the file.
+    content_type : str
+        The file's content type.
+    content : bytes
+        The file's content.
+
+    Returns
+    -------
+    bytes
+        The request body.
+    """
+    return b"".join(
+        (
+            f"--{boundary}\r\n".encode(),
+            b'Content-Disposition: form-data; name="file"; ',
+            f'filename="{filename}"\r\n'.encode(),
+            f"Content-Type: {content_type}\r\n\r\n".encode(),
+            content,
+            f"\r\n--{boundary}--\r\n".encode(),
+        )
+    )
+
 
 async def test_valid_file_upload(
     jp_fetch: Callable[..., Any],
     jp_root_dir: Path,
-    data_dir: Path,
+    dummy_txt_bytes: bytes,
 ) -> None:
     """Test a valid file upload.
 
@@ -25,26 +65,14 @@ async def test_valid_file_upload(
         The Jupyter server fetch function.
     jp_root_dir : Path
         The Jupyter server root directory.
-    data_dir : Path
-        The data directory.
+    dummy_txt_bytes : bytes
+        The content of the file to upload.
     """
-    file_path = data_dir / "dummy.txt"
-    boundary = uuid4().hex
     headers = {
-        "Content-Type": f"multipart/form-data; boundary={boundary}",
+        "Content-Type": f"multipart/form-data; boundary={_BOUNDARY}",
     }
-    filename = file_path.name
-    body = (
-        f"--{boundary}"
-        "\r\n"
-        'Content-Disposition: form-data; name="file"; '
-        f'filename="{filename}"'
-        "\r\n"
-        "Content-Type: text/plain\r\n\r\n"
-        f"{file_path.read_text()}"
-        "\r\n"
-        f"--{boundary}--"
-        "\r\n"
+    body = _multipart_body(
+        _BOUNDARY, "dummy.txt", "text/plain", dummy_txt_bytes
     )
     response = await jp_fetch(
         "waldiez",
@@ -54,11 +82,11 @@ async def test_valid_file_upload(
         body=body,
     )
     assert response.code == 200
-    response_data = json.loads(response.body.decode("utf-8"))
+    response_data = json.loads(response.body)
     assert "path" in response_data
-    destination = jp_root_dir / file_path.name
+    destination = jp_root_dir / "dummy.txt"
     assert response_data["path"] == str(destination)
-    assert destination.exists()
+    assert destination.read_bytes() == dummy_txt_bytes
     destination.unlink()
 
 
@@ -77,7 +105,7 @@ async def test_no_file_upload(jp_fetch: Callable[..., Any]) -> None:
 
 async def test_invalid_file_upload(
     jp_fetch: Callable[..., Any],
-    data_dir: Path,
+    blank_png_bytes: bytes,
 ) -> None:
     """Test an invalid file upload.
 
@@ -85,24 +113,13 @@ async def test_invalid_file_upload(
     ----------
     jp_fetch : Callable[..., Any]
         The Jupyter server fetch function.
-    data_dir : Path
-        The data directory.
+    blank_png_bytes : bytes
+        The content of the (not allowed) file to upload.
     """
-    image = data_dir / "blank.png"
-    boundary = uuid4().hex
     headers = {
-        "Content-Type": f"multipart/form-data; boundary={boundary}",
+        "Content-Type": f"multipart/form-data; boundary={_BOUNDARY}",
     }
-    image_data = image.read_bytes()
-    body = (
-        f"--{boundary}"
-        "\r\n"
-        'Content-Disposition: form-data; name="file"; '
-        'filename="blank.png"\r\n'
-        "Content-Type: image/png\r\n\r\n"
-    ).encode("utf-8")
-    body += image_data
-    body += ("\r\n--" + boundary + "--\r\n").encode("utf-8")
+    body = _multipart_body(_BOUNDARY, "blank.png", "image/png", blank_png_bytes)
     with pytest.raises(tornado.httpclient.HTTPClientError) as exc_info:
         await jp_fetch(
             "waldiez",
@@ -114,3 +131,12 @@ async def test_invalid_file_upload(
     assert exc_info.value.code == 400
     assert exc_info.value.response
     assert "File extension not allowed" in exc_info.value.response.reason
+
+
+def test_is_allowed_extension() -> None:
+    """Test the (case-insensitive) extension check."""
+    assert is_allowed_extension("notes.txt")
+    assert is_allowed_extension("REPORT.PDF")
+    assert is_allowed_extension("archive.tar.csv")
+    assert not is_allowed_extension("script.py")
+    assert not is_allowed_extension("txt")